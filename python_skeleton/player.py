@@ -2,10 +2,14 @@
 Sophisticated example pokerbot, written in Python.
 """
 
+import os
 import random
 import itertools
+from math import comb
 from typing import Optional
-from collections import defaultdict
+
+import numpy as np
+from numba import njit, prange
 
 from skeleton.actions import Action, CallAction, CheckAction, FoldAction, RaiseAction
 from skeleton.states import GameState, TerminalState, RoundState
@@ -13,6 +17,393 @@ from skeleton.states import NUM_ROUNDS, STARTING_STACK, BIG_BLIND, SMALL_BLIND
 from skeleton.bot import Bot
 from skeleton.runner import parse_args, run_bot
 
+RANKS = np.arange(2, 15, dtype=np.int8)
+BINOMIAL = np.array([[comb(n, k) for k in range(8)] for n in range(19)], dtype=np.intp)
+
+# Multisets of card values are numbered by size, then by _multiset_index within a size
+MULTISET_OFFSETS = np.cumsum([0] + [comb(12 + size, size) for size in range(8)])
+
+# Card value indexed by the character code of a card's rank, e.g. VAL_LUT[ord("T")] == 10;
+# -1 marks characters that are not ranks
+VAL_LUT = np.full(256, -1, dtype=np.int8)
+VAL_LUT[np.frombuffer(b"23456789TJQKA", dtype=np.uint8)] = RANKS
+
+# Suit index indexed by the character code of a card's suit, -1 for other characters
+SUIT_LUT = np.full(256, -1, dtype=np.int8)
+SUIT_LUT[np.frombuffer(b"cdhs", dtype=np.uint8)] = np.arange(4)
+
+# Value and suit of each card id, suit * 13 + value - 2
+DECK_VALS = np.array([i % 13 + 2 for i in range(52)], dtype=np.int8)
+DECK_SUITS = np.array([i // 13 for i in range(52)], dtype=np.int8)
+
+
+@njit(cache=True)
+def _straight_runs(mask):
+    """
+    Bits b of a card value bitmask such that values b to b + 4 are all present.
+
+    An ace (bit 14) also counts as a one (bit 1), so the wheel is found too.
+    """
+    mask = mask | ((mask >> 14) & 1) << 1
+    return mask & mask >> 1 & mask >> 2 & mask >> 3 & mask >> 4
+
+
+def _pack_rank(hand_class: int, *values: np.ndarray) -> np.ndarray:
+    """
+    Ranks packed as hand_class << 20 followed by up to five arrays of card values, 4 bits
+    each, so that ranks compare in the same order as the hands.
+    """
+    rank = hand_class << 20
+    for shift, value in zip((16, 12, 8, 4, 0), values):
+        rank = rank | value << shift
+    return rank
+
+
+def _top_values(present: np.ndarray, count: int) -> list:
+    """
+    The count highest card values flagged in each row of an (N, 15) mask, highest first, 0 when missing.
+    """
+    values = np.sort(np.where(present, np.arange(15), 0), axis=1)
+    return [values[:, -1 - i] for i in range(count)]
+
+
+def _rank_hands(cards: np.ndarray) -> np.ndarray:
+    """
+    Rank a batch of 7-card hands given as an (N, 7) array of card values.
+
+    Only used to fill HAND_TABLE. Cards carry no suits here; flushes are ranked by
+    evaluate_hand from its suit bitmasks.
+    """
+    rows = np.arange(len(cards))[:, None]
+    value_counts = np.bincount((rows * 15 + cards).ravel(), minlength=len(cards) * 15).reshape(-1, 15)
+    values = np.arange(15)
+
+    quad = np.where(value_counts == 4, values, 0).max(axis=1)
+    high_trip, low_trip = _top_values(value_counts == 3, 2)
+    high_pair, low_pair, third_pair = _top_values(value_counts == 2, 3)
+    singles = _top_values(value_counts == 1, 5)
+
+    # Straights from the bitmask of the values present; frexp gives the highest run's bit length
+    straights = _straight_runs(np.bitwise_or.reduce(np.left_shift(1, cards.astype(np.int32)), axis=1))
+    straight_high = np.frexp(straights)[1] + 3
+
+    # Kickers that may come from a pair or trip broken up by a better hand
+    quad_kicker = np.where((value_counts > 0) & (values != quad[:, None]), values, 0).max(axis=1)
+    two_pair_kicker = np.maximum(third_pair, singles[0])
+
+    return np.select(
+        [
+            quad > 0,
+            (high_trip > 0) & ((low_trip > 0) | (high_pair > 0)),
+            straights > 0,
+            high_trip > 0,
+            low_pair > 0,
+            high_pair > 0,
+        ],
+        [
+            _pack_rank(7, quad, quad_kicker),
+            _pack_rank(6, high_trip, np.maximum(low_trip, high_pair)),
+            _pack_rank(4, straight_high),
+            _pack_rank(3, high_trip, *singles[:2]),
+            _pack_rank(2, high_pair, low_pair, two_pair_kicker),
+            _pack_rank(1, high_pair, *singles[:3]),
+        ],
+        default=_pack_rank(0, *singles),
+    )
+
+
+def decode_cards(cards: tuple) -> tuple:
+    """
+    Values and suits of card strings such as "Ah", as two int8 arrays.
+
+    Cards are assumed to come from a standard 52-card deck, ranks 2-A and suits cdhs.
+    Raises ValueError for anything else, such as the engine's short deck cards "1s".
+    """
+    codes = np.frombuffer("".join(cards).encode(), dtype=np.uint8)
+    values, suits = VAL_LUT[codes[0::2]], SUIT_LUT[codes[1::2]]
+    if (values < 0).any() or (suits < 0).any():
+        raise ValueError(f"Unknown card in {cards}")
+    return values, suits
+
+
+def _multiset_index(values: np.ndarray) -> np.ndarray:
+    """
+    Dense index of each row of ascending card values among all multisets of that size.
+    """
+    size = values.shape[1]
+    return BINOMIAL[values.astype(np.intp) - 2 + np.arange(size), np.arange(1, size + 1)].sum(axis=1)
+
+
+def board_address(values: np.ndarray) -> int:
+    """
+    Dense index of a board of up to five cards among all multisets of card values.
+    """
+    return int(MULTISET_OFFSETS[len(values)] + _multiset_index(np.sort(values)[None])[0])
+
+
+def _build_hand_table() -> np.ndarray:
+    """
+    Build the 7-card lookup table walked by evaluate_hand.
+
+    Every multiset of up to six card values is a state with a row of 15 entries, one per
+    card value. An entry holds the offset of the state reached by adding that card, or
+    the final rank once the seventh card is added.
+    """
+    offsets = MULTISET_OFFSETS
+    table = np.zeros(offsets[7] * 15, dtype=np.int32)
+    for size in range(7):
+        states = np.array(list(itertools.combinations_with_replacement(RANKS, size)), dtype=np.int8)
+        rows = (offsets[size] + _multiset_index(states)) * 15
+        for value in RANKS:
+            hands = np.sort(np.concatenate((states, np.full((len(states), 1), value, dtype=np.int8)), axis=1), axis=1)
+            if size < 6:
+                table[rows + value] = (offsets[size + 1] + _multiset_index(hands)) * 15
+            else:
+                table[rows + value] = _rank_hands(hands)
+    return table
+
+
+HAND_TABLE = _build_hand_table()
+MC_BLOCKS = 64
+MC_CHUNK = 256
+MC_MAX_SIMULATIONS = 10000
+PREFLOP_SIMULATIONS = 1000000
+
+# Opponent model saved at the end of each match and loaded by the next one
+OPPONENT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opp_model.npy")
+
+# Preflop equity per starting hand class, simulated once by simulate_preflop_equity and bundled with the bot
+PREFLOP_EQUITY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.npy")
+
+
+@njit(cache=True)
+def _highest_bit(mask: int) -> int:
+    """
+    Position of the highest set bit of a non-zero mask.
+    """
+    bit = 0
+    while mask >> (bit + 1):
+        bit += 1
+    return bit
+
+
+@njit(cache=True)
+def _flush_rank(suit_mask: int) -> int:
+    """
+    Rank of the flush in one suit's card value bitmask, or 0 if the suit has fewer than five cards.
+
+    Ranks are packed like _pack_rank: a straight flush by its high card, a flush by its
+    five highest cards.
+    """
+    count = 0
+    remaining = suit_mask
+    while remaining:
+        remaining &= remaining - 1
+        count += 1
+    if count < 5:
+        return 0
+
+    straight_flush = _straight_runs(suit_mask)
+    if straight_flush:
+        return 8 << 20 | (_highest_bit(straight_flush) + 4) << 16
+    rank = 5 << 20
+    remaining = suit_mask
+    for shift in range(16, -4, -4):
+        value = _highest_bit(remaining)
+        rank |= value << shift
+        remaining ^= 1 << value
+    return rank
+
+
+# Seven cards cannot hold both a flush and a full house, so a flush rank simply replaces
+# the lookup table's rank wherever hands are ranked
+@njit(cache=True)
+def _hand_flush_rank(cards: int) -> int:
+    """
+    Rank of the flush in a card set with bit 16 * suit + value per card, or 0 if there is none.
+    """
+    for suit in range(4):
+        flush = _flush_rank((cards >> (16 * suit)) & 0xFFFF)
+        if flush:
+            return flush
+    return 0
+
+
+# Flush rank of every 15-bit card value bitmask of one suit
+FLUSH_RANKS = np.array([_flush_rank(mask) for mask in range(1 << 15)], dtype=np.int32)
+
+
+@njit(cache=True)
+def _xorshift64(state: np.uint64) -> np.uint64:
+    """
+    Next state of a xorshift64 random number generator.
+    """
+    state ^= state << np.uint64(13)
+    state ^= state >> np.uint64(7)
+    state ^= state << np.uint64(17)
+    return state
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def mc_winrate(
+    table: np.ndarray,
+    my_vals: np.ndarray,
+    my_suits: np.ndarray,
+    board_vals: np.ndarray,
+    board_suits: np.ndarray,
+    deck_vals: np.ndarray,
+    deck_suits: np.ndarray,
+    decks: np.ndarray,
+    swaps: np.ndarray,
+    counts: np.ndarray,
+    next_card_counts: np.ndarray,
+    load_deck: bool,
+    n_sims: int,
+    seed: int,
+) -> None:
+    """
+    Count the simulations in which my hand beats a random opponent hand and runout.
+
+    Adds [pair sims, pair wins, other sims, other wins] per block to counts, (MC_BLOCKS, 4),
+    and before the river also to next_card_counts, (MC_BLOCKS, 52, 4), by first runout card.
+    """
+    num_drawn = 2 + 5 - len(board_vals)
+    num_cards = len(deck_vals)
+
+    # Walk the known cards once; each simulation only adds the cards it draws
+    board_state = 0
+    board_cards = 0
+    for i in range(len(board_vals)):
+        board_state = table[board_state + board_vals[i]]
+        board_cards |= 1 << (16 * board_suits[i] + board_vals[i])
+    my_state = board_state
+    my_cards = board_cards
+    for i in range(len(my_vals)):
+        my_state = table[my_state + my_vals[i]]
+        my_cards |= 1 << (16 * my_suits[i] + my_vals[i])
+
+    # Each block has its own xorshift64 stream, so the counts only depend on the arguments
+    for block in prange(MC_BLOCKS):
+        # Spread the seeds apart; the low bit keeps the state away from zero
+        state = (np.uint64(seed) * np.uint64(MC_BLOCKS) + np.uint64(block)) * np.uint64(0x9E3779B97F4A7C15) | np.uint64(1)
+        # The block's row of the scratch decks and its swap record; the swaps are undone after
+        # every simulation, so the row holds the deck in order again when the kernel returns
+        deck_v = decks[block, 0, :num_cards]
+        deck_s = decks[block, 1, :num_cards]
+        swapped = swaps[block]
+        if load_deck:
+            deck_v[:] = deck_vals
+            deck_s[:] = deck_suits
+        for _ in range(n_sims * (block + 1) // MC_BLOCKS - n_sims * block // MC_BLOCKS):
+            # Partial Fisher-Yates: the first num_drawn cards are a uniform random draw
+            for i in range(num_drawn):
+                state = _xorshift64(state)
+                j = i + int((state >> np.uint64(32)) % np.uint64(num_cards - i))
+                swapped[i] = j
+                deck_v[i], deck_v[j] = deck_v[j], deck_v[i]
+                deck_s[i], deck_s[j] = deck_s[j], deck_s[i]
+
+            my_rank = my_state
+            opponent_rank = table[table[board_state + deck_v[0]] + deck_v[1]]
+            runout = 0
+            for i in range(2, num_drawn):
+                my_rank = table[my_rank + deck_v[i]]
+                opponent_rank = table[opponent_rank + deck_v[i]]
+                runout |= 1 << (16 * deck_s[i] + deck_v[i])
+
+            # Suits are tracked in card sets with bit 16 * suit + value per card
+            my_flush = _hand_flush_rank(my_cards | runout)
+            if my_flush:
+                my_rank = my_flush
+            opponent_cards = board_cards | runout | 1 << (16 * deck_s[0] + deck_v[0]) | 1 << (16 * deck_s[1] + deck_v[1])
+            opponent_flush = _hand_flush_rank(opponent_cards)
+            if opponent_flush:
+                opponent_rank = opponent_flush
+
+            stratum = 0 if deck_v[0] == deck_v[1] else 2
+            win = 1 if my_rank > opponent_rank else 0
+            # Split by whether the opponent's hole cards are a pair; given the first runout
+            # card, the rest of a simulation is drawn just as for the board with it added
+            counts[block, stratum] += 1
+            counts[block, stratum + 1] += win
+            if num_drawn > 2:
+                next_card = deck_s[2] * 13 + deck_v[2] - 2
+                next_card_counts[block, next_card, stratum] += 1
+                next_card_counts[block, next_card, stratum + 1] += win
+
+            # Replay the swaps in reverse to put the deck back in order
+            for i in range(num_drawn - 1, -1, -1):
+                j = swapped[i]
+                deck_v[i], deck_v[j] = deck_v[j], deck_v[i]
+                deck_s[i], deck_s[j] = deck_s[j], deck_s[i]
+
+
+def hand_class(values: np.ndarray, suits: np.ndarray) -> int:
+    """
+    Index of two hole cards among the 169 starting hand classes.
+
+    The classes form a 13x13 grid of card values: pairs on the diagonal, suited hands
+    above it and offsuit hands below it.
+    """
+    high, low = int(max(values[:2])), int(min(values[:2]))
+    if suits[0] == suits[1]:
+        return 13 * (low - 2) + (high - 2)
+    return 13 * (high - 2) + (low - 2)
+
+
+def _stratified_estimate(counts: np.ndarray, pair_probability: float) -> tuple:
+    """
+    Win rate and its standard error from mc_winrate counts, weighting each stratum by its probability.
+    """
+    pooled = counts[1::2].sum() / counts[0::2].sum()
+    estimate = 0.0
+    variance = 0.0
+    for sims, wins, weight in ((counts[0], counts[1], pair_probability), (counts[2], counts[3], 1 - pair_probability)):
+        mean = wins / sims if sims else pooled
+        estimate += weight * mean
+        variance += weight**2 * mean * (1 - mean) / max(sims, 1)
+    return estimate, variance**0.5
+
+
+def _unseen_deck(values: np.ndarray, suits: np.ndarray) -> tuple:
+    """
+    Values and suits of the cards other than the known ones, and the probability that two
+    of them drawn at random are a pair.
+    """
+    unseen = np.ones(52, dtype=bool)
+    unseen[suits * 13 + values - 2] = False
+    deck_vals, deck_suits = DECK_VALS[unseen], DECK_SUITS[unseen]
+    value_counts = np.bincount(deck_vals, minlength=15)
+    pair_probability = (value_counts * (value_counts - 1)).sum() / (len(deck_vals) * (len(deck_vals) - 1))
+    return deck_vals, deck_suits, pair_probability
+
+
+def simulate_preflop_equity() -> np.ndarray:
+    """
+    Win rate of each starting hand class against a random hand, indexed by hand_class.
+
+    Every class is simulated PREFLOP_SIMULATIONS times, which takes a while; the bot
+    loads the bundled table instead. Regenerate it after changing the hand ranks with
+    np.save(PREFLOP_EQUITY_PATH, simulate_preflop_equity()).
+    """
+    decks = np.empty((MC_BLOCKS, 2, 52), dtype=np.int8)
+    swaps = np.empty((MC_BLOCKS, 7), dtype=np.int8)
+    next_card_counts = np.zeros((MC_BLOCKS, 52, 4), dtype=np.int64)  # Not needed here
+    equity = np.empty(169)
+    for row, col in np.ndindex(13, 13):
+        values = np.array([row + 2, col + 2], dtype=np.int8)
+        suits = np.array([0, 0 if row < col else 1], dtype=np.int8)
+        deck_vals, deck_suits, pair_probability = _unseen_deck(values, suits)
+        index = hand_class(values, suits)
+        counts = np.zeros((MC_BLOCKS, 4), dtype=np.int64)
+        mc_winrate(
+            HAND_TABLE, values, suits, values[:0], suits[:0], deck_vals, deck_suits,
+            decks, swaps, counts, next_card_counts, True, PREFLOP_SIMULATIONS, index,
+        )
+        equity[index] = _stratified_estimate(counts.sum(axis=0), pair_probability)[0]
+    return equity
+
+
 class Player(Bot):
     """
     A sophisticated pokerbot.
@@ -23,7 +414,30 @@ class Player(Bot):
         Called when a new game starts. Called exactly once.
         """
         self.log = []
-        self.opponent_model = defaultdict(lambda: 0.5)  # Initialize opponent model with default value of 0.5
+        try:
+            self.opponent_model = np.load(OPPONENT_MODEL_PATH)  # Learned in earlier matches
+        except (OSError, ValueError):
+            self.opponent_model = None
+        if self.opponent_model is None or self.opponent_model.shape != (MULTISET_OFFSETS[6],):
+            self.opponent_model = np.full(MULTISET_OFFSETS[6], 0.5, dtype=np.float32)  # One entry per board_address, initialized to 0.5
+        self._rng = random.Random()
+
+        # Bundled preflop equity per starting hand class
+        self._preflop_equity = np.load(PREFLOP_EQUITY_PATH)
+        if self._preflop_equity.shape != (169,):
+            raise ValueError(f"{PREFLOP_EQUITY_PATH} does not hold one equity per starting hand class")
+
+        # Simulation counts per (my_cards, board_cards), in total and per next board card, kept for the current round
+        self._equity_counts = {}
+
+        # Scratch decks reused by every simulation chunk, and the cards they were loaded for
+        self._decks = np.empty((MC_BLOCKS, 2, 52), dtype=np.int8)
+        self._swaps = np.empty((MC_BLOCKS, 7), dtype=np.int8)
+        self._decks_key = None
+
+        # Run one simulation chunk so the kernel is compiled before the first action;
+        # negative pot odds stop after one chunk
+        self.monte_carlo_hand_strength(("Ac", "Kd"), ("2h", "7s", "Tc"), -1.0)
 
     def handle_new_round(self, game_state: GameState, round_state: RoundState, active: int) -> None:
         """
@@ -32,15 +446,23 @@ class Player(Bot):
         self.log = []
         self.log.append("================================")
         self.log.append("new round")
+        self._equity_counts.clear()  # Hole cards and boards practically never repeat across rounds
 
     def handle_round_over(self, game_state: GameState, terminal_state: TerminalState, active: int, is_match_over: bool) -> Optional[str]:
         """
         Called when a round ends.
         """
         self.update_opponent_model(terminal_state)
+        if is_match_over:
+            try:
+                np.save(OPPONENT_MODEL_PATH, self.opponent_model)
+            except OSError:
+                pass  # The next match starts from a fresh model; the logs must still be returned
         self.log.append("game over")
         self.log.append("================================\n")
-        return self.log
+
+        # get_action logs (format, arguments) pairs; format them only now that the logs are sent
+        return [entry if isinstance(entry, str) else entry[0] % entry[1] for entry in self.log]
 
     def get_action(self, observation: dict) -> Action:
         """
@@ -50,37 +472,50 @@ class Player(Bot):
         opp_contribution = STARTING_STACK - observation["opp_stack"]
         continue_cost = observation["opp_pip"] - observation["my_pip"]
 
-        self.log.append("My cards: " + str(observation["my_cards"]))
-        self.log.append("Board cards: " + str(observation["board_cards"]))
-        self.log.append("My stack: " + str(observation["my_stack"]))
-        self.log.append("My contribution: " + str(my_contribution))
-        self.log.append("My bankroll: " + str(observation["my_bankroll"]))
+        self.log.append((
+            "My cards: %s\nBoard cards: %s\nMy stack: %s\nMy contribution: %s\nMy bankroll: %s",
+            (observation["my_cards"], observation["board_cards"], observation["my_stack"], my_contribution, observation["my_bankroll"]),
+        ))
+
+        # Canonical keys for the equity cache and the opponent model
+        my_cards = tuple(sorted(observation["my_cards"]))
+        board_cards = tuple(sorted(observation["board_cards"]))
 
-        # Estimate hand strength using Monte Carlo simulations
-        hand_strength = self.monte_carlo_hand_strength(observation["my_cards"], observation["board_cards"])
+        # Without cards the equity model understands, give up the hand as cheaply as possible
+        try:
+            decode_cards(my_cards + board_cards)
+        except ValueError as error:
+            self.log.append(str(error))
+            return CheckAction() if CheckAction in observation["legal_actions"] else FoldAction()
 
         # Implement pot odds and pot equity considerations
         pot_odds = continue_cost / (continue_cost + opp_contribution + observation["opp_pip"])
+
+        # Estimate hand strength using Monte Carlo simulations, unless cheap bounds already settle it
+        low, high = self.cheap_equity_bounds(my_cards, board_cards)
+        if low > pot_odds:
+            hand_strength = low
+        elif high < pot_odds:
+            hand_strength = high
+        else:
+            hand_strength = self.monte_carlo_hand_strength(my_cards, board_cards, pot_odds)
         pot_equity = hand_strength
 
         # Opponent modeling and exploitation
-        opponent_action_probability = self.opponent_model[observation["board_cards"]]
+        opponent_action_probability = self.opponent_model[board_address(decode_cards(board_cards)[0])]
 
         if pot_equity > pot_odds:
             # Call or raise if pot odds are favorable
-            if RaiseAction in observation["legal_actions"] and random.random() < (1 - opponent_action_probability):
+            if RaiseAction in observation["legal_actions"] and self._rng.random() < (1 - opponent_action_probability):
                 min_cost = observation["min_raise"] - observation["my_pip"]
                 max_cost = observation["max_raise"] - observation["my_pip"]
                 raise_amount = self.calculate_raise_amount(min_cost, max_cost, pot_odds, pot_equity)
                 return RaiseAction(raise_amount)
             else:
                 return CallAction()
-        else:
-            # Fold if pot odds are not favorable
-            return FoldAction()
 
         # Implement bluffing and semi-bluffing strategies
-        if RaiseAction in observation["legal_actions"] and random.random() < (opponent_action_probability * 0.3):
+        if RaiseAction in observation["legal_actions"] and self._rng.random() < (opponent_action_probability * 0.3):
             min_cost = observation["min_raise"] - observation["my_pip"]
             max_cost = observation["max_raise"] - observation["my_pip"]
             raise_amount = self.calculate_raise_amount(min_cost, max_cost, pot_odds, pot_equity, bluff=True)
@@ -88,45 +523,83 @@ class Player(Bot):
 
         if CheckAction in observation["legal_actions"]:
             return CheckAction()
-        return CallAction()
 
-    def monte_carlo_hand_strength(self, my_cards: list, board_cards: list) -> float:
+        # Fold if pot odds are not favorable
+        return FoldAction()
+
+    def monte_carlo_hand_strength(self, my_cards: tuple, board_cards: tuple, pot_odds: float) -> float:
         """
         Estimate the strength of the hand using Monte Carlo simulations.
-        """
-        # Convert card strings to numerical values
-        value_map = {
-            '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14
-        }
-        my_values = [value_map[card[0]] for card in my_cards]
-        board_values = [value_map[card[0]] for card in board_cards]
-
-        # Generate all possible remaining cards
-        deck = list(range(2, 15)) * 4
-        for value in my_values + board_values:
-            deck.remove(value)
 
-        # Perform Monte Carlo simulations
-        win_count = 0
-        num_simulations = 10000
-        for _ in range(num_simulations):
-            # Generate a random opponent hand
-            opponent_hand = random.sample(deck, 2)
-            remaining_cards = [card for card in deck if card not in opponent_hand]
+        Simulations run in chunks of MC_CHUNK until the estimate is 2.5 standard errors
+        away from pot_odds or MC_MAX_SIMULATIONS have run. Counts are kept for the current
+        round, so callers pass the cards as sorted tuples and repeated calls resume them.
+        Preflop, the strength is looked up in the bundled preflop equity table instead.
 
-            # Simulate the remaining community cards
-            community_cards = board_values + random.sample(remaining_cards, 5 - len(board_values))
-
-            # Evaluate the hands
-            my_hand_rank = self.evaluate_hand(my_values, community_cards)
-            opponent_hand_rank = self.evaluate_hand(opponent_hand, community_cards)
-
-            if my_hand_rank > opponent_hand_rank:
-                win_count += 1
+        Counts are also kept per next board card. A board one card longer than one already
+        simulated, such as the turn after the flop, starts from the earlier simulations
+        whose first runout card is that card; they are drawn exactly as its own would be.
+        """
+        if not board_cards:
+            return float(self._preflop_equity[hand_class(*decode_cards(my_cards))])
+
+        key = (my_cards, board_cards)
+        if key not in self._equity_counts:
+            # Convert card strings to numerical values
+            values, suits = decode_cards(my_cards + board_cards)
+            deck_vals, deck_suits, pair_probability = _unseen_deck(values, suits)
+            kernel_args = (HAND_TABLE, values[:2], suits[:2], values[2:], suits[2:], deck_vals, deck_suits)
+
+            # Per-block count buffers the kernel adds to; the river has no next card to split by
+            counts = np.zeros((MC_BLOCKS, 4), dtype=np.int64)
+            next_card_counts = np.zeros((MC_BLOCKS, 52 if len(board_cards) < 5 else 0, 4), dtype=np.int64)
+
+            # Reuse the simulations of earlier streets that ran out to this board
+            for i in range(len(board_cards)):
+                earlier = self._equity_counts.get((my_cards, board_cards[:i] + board_cards[i + 1:]))
+                if earlier is not None:
+                    counts[0] += earlier[3][:, suits[2 + i] * 13 + values[2 + i] - 2].sum(axis=0)
+            self._equity_counts[key] = (kernel_args, pair_probability, counts, next_card_counts)
+        kernel_args, pair_probability, counts, next_card_counts = self._equity_counts[key]
+
+        # Bind what every chunk uses to locals; the scratch decks only need loading before the first one
+        simulate, estimate = mc_winrate, _stratified_estimate
+        decks, swaps, getrandbits = self._decks, self._swaps, self._rng.getrandbits
+        load_deck = self._decks_key != key
+
+        # Perform Monte Carlo simulations until the comparison with the pot odds is clear
+        while True:
+            total_counts = counts.sum(axis=0)
+            num_simulations = total_counts[0] + total_counts[2]
+            if num_simulations >= MC_CHUNK:
+                hand_strength, standard_error = estimate(total_counts, pair_probability)
+                if abs(hand_strength - pot_odds) > 2.5 * standard_error or num_simulations >= MC_MAX_SIMULATIONS:
+                    return hand_strength
+            if load_deck:
+                self._decks_key = key  # Only once a chunk actually loads the decks
+            simulate(*kernel_args, decks, swaps, counts, next_card_counts, load_deck, MC_CHUNK, getrandbits(31))
+            load_deck = False
+
+    def cheap_equity_bounds(self, my_cards: tuple, board_cards: tuple) -> tuple:
+        """
+        Cheap (low, high) bounds on the hand strength.
 
-        # Normalize the win count to get the hand strength
-        hand_strength = win_count / num_simulations
-        return hand_strength
+        Preflop both bounds are the starting hand's bundled preflop equity. After the flop
+        the lower bound depends on whether a hole card makes a pair, or better, with the
+        board. Straights and flushes are not looked for, so the upper bound there is 1;
+        pot odds never exceed 1/3, so only the lower bound can settle a decision.
+        """
+        values, suits = decode_cards(my_cards + board_cards)
+        if not board_cards:
+            equity = float(self._preflop_equity[hand_class(values, suits)])
+            return equity, equity
+
+        hole_matches = [np.count_nonzero(values == value) for value in values[:2]]
+        if max(hole_matches) >= 3 or (min(hole_matches) >= 2 and values[0] != values[1]):
+            return 0.4, 1.0  # Two pair or better
+        if max(hole_matches) >= 2:
+            return 0.15, 1.0  # One pair
+        return 0.0, 1.0  # High card, or a straight or flush
 
     def calculate_raise_amount(self, min_cost: int, max_cost: int, pot_odds: float, pot_equity: float, bluff: bool = False) -> int:
         """
@@ -147,79 +620,40 @@ class Player(Bot):
         Update the opponent model based on the terminal state of the round.
         """
         previous_state = terminal_state.previous_state
-        board_cards = previous_state.board_cards
+        board_cards = tuple(sorted(previous_state.board))
         opp_hand = previous_state.hands[1]
 
-        if opp_hand:
-            # Opponent's hand was revealed
-            opp_hand_strength = self.evaluate_hand(opp_hand, board_cards)
-            action_probability = self.opponent_model[board_cards]
+        if opp_hand and len(board_cards) == 5:
+            # Opponent's hand was revealed at showdown
+            try:
+                opp_values, opp_suits = decode_cards(tuple(opp_hand))
+                board_values, board_suits = decode_cards(board_cards)
+            except ValueError:
+                return
+            opp_hand_rank = self.evaluate_hand(
+                list(zip(opp_values.tolist(), opp_suits.tolist())),
+                list(zip(board_values.tolist(), board_suits.tolist())),
+            )
+            opp_hand_strength = opp_hand_rank / (9 << 20)  # Packed ranks scaled into [0, 1)
+            board_key = board_address(board_values)
+            action_probability = self.opponent_model[board_key]
 
             # Update the opponent model using a simple linear update rule
             update_factor = 0.1
-            self.opponent_model[board_cards] = (1 - update_factor) * action_probability + update_factor * opp_hand_strength
+            self.opponent_model[board_key] = (1 - update_factor) * action_probability + update_factor * opp_hand_strength
 
     @staticmethod
     def evaluate_hand(hand: list, community_cards: list) -> int:
         """
-        Evaluate the strength of a hand using a simple hand ranking system.
-        """
-        # Combine the hand and community cards
-        all_cards = hand + community_cards
-
-        # Check for straight flush
-        suits = [card % 4 for card in all_cards]
-        values = [card // 4 for card in all_cards]
-        for suit in range(4):
-            suit_values = [value for value, s in zip(values, suits) if s == suit]
-            if len(suit_values) >= 5:
-                straight_flush = sorted(suit_values, reverse=True)[:5]
-                if straight_flush == list(range(straight_flush[0], straight_flush[0] - 5, -1)):
-                    return 8 + straight_flush[0]
-
-        # Check for four of a kind
-        value_counts = [values.count(value) for value in range(2, 15)]
-        if 4 in value_counts:
-            return 7 + value_counts.index(4) * 2
-
-        # Check for full house
-        if 3 in value_counts and 2 in value_counts:
-            return 6 + value_counts.index(3) * 2 + value_counts.index(2)
-
-        # Check for flush
-        for suit in range(4):
-            suit_values = [value for value, s in zip(values, suits) if s == suit]
-            if len(suit_values) >= 5:
-                flush = sorted(suit_values, reverse=True)[:5]
-                return 5 + flush[0]
-
-        # Check for straight
-        straight_values = sorted(list(set(values)), reverse=True)
-        for i in range(len(straight_values) - 4):
-            straight = straight_values[i:i+5]
-            if straight == list(range(straight[0], straight[0] - 5, -1)):
-                return 4 + straight[0]
-
-        # Check for three of a kind
-        if 3 in value_counts:
-            return 3 + value_counts.index(3) * 2
-
-        # Check for two pairs
-        pairs = [value for value, count in zip(range(2, 15), value_counts) if count >= 2]
-        if len(pairs) >= 2:
-            pairs.sort(reverse=True)
-            return 2 + pairs[0] * 2 + pairs[1]
-
-        # Check for one pair
-        if 2 in value_counts:
-            pair_value = value_counts.index(2) * 2
-            kickers = [value for value in values if value != pair_value]
-            kickers.sort(reverse=True)
-            return 1 + pair_value * 2 + kickers[0]
-
-        # High card
-        values.sort(reverse=True)
-        return values[0]
+        Evaluate the strength of a 7-card hand given as (value, suit) pairs.
+        """
+        table = HAND_TABLE
+        suit_masks = [0, 0, 0, 0]
+        rank = 0
+        for value, suit in hand + community_cards:
+            suit_masks[suit] |= 1 << value
+            rank = table[rank + value]
+        return int(FLUSH_RANKS[suit_masks].max() or rank)
 
 if __name__ == '__main__':
     run_bot(Player(), parse_args())